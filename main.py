@@ -1,11 +1,18 @@
 """Simple GUI for montuno generation."""
 
+import itertools
+import logging
+import os
+import re
+
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from tkinter import Tk, Text, Button, Label, StringVar, Radiobutton, ttk
 
-import midi_utils
-
-from modos import MODOS_DISPONIBLES
+# ``midi_utils`` (and through it pretty_midi/numpy/mido) is deliberately NOT
+# imported here: those libraries load large lookup tables and would delay the
+# first window paint.  They are imported lazily from ``generar`` and from the
+# deferred mode loader in ``main``.
 
 
 # Opciones de armonización disponibles.  También se pueden alternar dentro
@@ -26,24 +33,84 @@ VARIACIONES = ["A", "B", "C", "D"]
 CLAVES = {
     "Clave 2-3": {
         "midi_prefix": "tradicional_2-3",
-        "primer_bloque": [3, 4, 4, 3],
-        "patron_repetido": [5, 4, 4, 3],
+        "primer_bloque": (3, 4, 4, 3),
+        "patron_repetido": (5, 4, 4, 3),
     },
     "Clave 3-2": {
         "midi_prefix": "tradicional_3-2",
-        "primer_bloque": [3, 3, 5, 4],
-        "patron_repetido": [4, 3, 5, 4],
+        "primer_bloque": (3, 3, 5, 4),
+        "patron_repetido": (4, 3, 5, 4),
     },
 }
 
+# Precompute the expanded grouping pattern once per clave (tuples, so the
+# cached value can't be mutated downstream) instead of concatenating lists
+# on every Generar click.
+for _cfg in CLAVES.values():
+    _cfg["patron_grupos"] = _cfg["primer_bloque"] + _cfg["patron_repetido"] * 3
+
+# Reference-MIDI label for every (clave, variación) pair, formatted once so
+# toggling a Radiobutton is a plain dict lookup.
+MIDI_LABELS = {
+    (clave, var): f"reference_midi_loops/{cfg['midi_prefix']}_{var}.mid"
+    for clave, cfg in CLAVES.items()
+    for var in VARIACIONES
+}
+
 # ---------------------------------------------------------------------------
-# Global counter for the generated montunos so output files have
-# sequential names.
+# Counter for the generated montunos so output files have sequential names.
+# ``next()`` on itertools.count is atomic under the GIL, so concurrent
+# generations can never draw the same number.
 # ---------------------------------------------------------------------------
-CONTADOR_MONTUNO = 1
+_CONTADOR_MONTUNO = itertools.count(1)
+
+# Last clave whose rhythmic pattern was pushed into midi_utils, so repeated
+# generations with the same clave skip the reconfiguration entirely.
+_CLAVE_APLICADA: str | None = None
+
+# Collapses any run of whitespace in the progression text in a single pass
+_ESPACIOS_RE = re.compile(r"\s+")
+
+# Single worker so the heavy MIDI work never blocks the Tk mainloop and at
+# most one generation runs at a time.
+EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+# Output directory resolved once at import; ``mkdir`` costs a syscall even
+# with exist_ok=True, so it is not repeated per click.  Guarded so a
+# headless or odd $HOME setup doesn't break importing the module.
+DESKTOP = Path.home() / "Desktop"
+try:
+    DESKTOP.mkdir(parents=True, exist_ok=True)
+except OSError:
+    pass
+
+
+def _reservar_salida(directorio: Path) -> Path:
+    """Reserve the next free sequential output file atomically.
+
+    The file is created with ``O_CREAT | O_EXCL`` so checking and claiming
+    the name is a single syscall — no window for another invocation (or an
+    existing file on disk) to race us between the check and the write.
+    """
+
+    while True:
+        numero = next(_CONTADOR_MONTUNO)
+        ruta = directorio / f"montuno_tradicional_clave_{numero}.mid"
+        try:
+            fd = os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            continue
+        except FileNotFoundError:
+            # The directory disappeared since import; recreate and retry.
+            directorio.mkdir(parents=True, exist_ok=True)
+            fd = os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        os.close(fd)
+        return ruta
 
 
 def generar(
+    root: Tk,
+    boton: Button,
     status_var: StringVar,
     clave_var: StringVar,
     variacion_var: StringVar,
@@ -51,33 +118,33 @@ def generar(
     modo_combo: ttk.Combobox,
     armon_combo: ttk.Combobox,
 ) -> None:
+    import midi_utils
+    from modos import MODOS_DISPONIBLES
+
     clave = clave_var.get()
     cfg = CLAVES.get(clave)
     if cfg is None:
         status_var.set(f"Clave no soportada: {clave}")
         return
 
-    # Apply the rhythmic pattern for the selected clave
-    midi_utils.PRIMER_BLOQUE = cfg["primer_bloque"]
-    midi_utils.PATRON_REPETIDO = cfg["patron_repetido"]
-    midi_utils.PATRON_GRUPOS = midi_utils.PRIMER_BLOQUE + midi_utils.PATRON_REPETIDO * 3
+    # Apply the rhythmic pattern for the selected clave (memoized on the
+    # clave name; there are only two, so toggling back is free)
+    global _CLAVE_APLICADA
+    if clave != _CLAVE_APLICADA:
+        midi_utils.PRIMER_BLOQUE = cfg["primer_bloque"]
+        midi_utils.PATRON_REPETIDO = cfg["patron_repetido"]
+        midi_utils.PATRON_GRUPOS = cfg["patron_grupos"]
+        _CLAVE_APLICADA = clave
 
-    global CONTADOR_MONTUNO
     variacion = variacion_var.get()
     midi_ref = Path("reference_midi_loops") / f"{cfg['midi_prefix']}_{variacion}.mid"
     if not midi_ref.exists():
         status_var.set(f"No se encontró {midi_ref}")
         return
 
-    # Output file stored on the user's desktop with a sequential name
-    desktop = Path.home() / "Desktop"
-    desktop.mkdir(parents=True, exist_ok=True)
-    output = desktop / f"montuno_tradicional_clave_{CONTADOR_MONTUNO}.mid"
-    CONTADOR_MONTUNO += 1
-
-    progresion_texto = texto.get("1.0", "end")
-    progresion_texto = " ".join(progresion_texto.split())  # limpia espacios extra
-    if not progresion_texto.strip():
+    # limpia espacios extra sin la lista intermedia de split()
+    progresion_texto = _ESPACIOS_RE.sub(" ", texto.get("1.0", "end")).strip()
+    if not progresion_texto:
         status_var.set("Ingresa una progresión de acordes")
         return
 
@@ -89,14 +156,39 @@ def generar(
 
     armonizacion = armon_combo.get()
 
-    try:
-        funcion(progresion_texto, midi_ref, output, armonizacion)
-        status_var.set(f"MIDI generado: {output}")
-    except Exception as e:
-        status_var.set(f"Error: {e}")
+    # Output file stored on the user's desktop with a sequential name.
+    # Reserved only after all validations so a rejected click leaves nothing
+    # behind; if generation fails the stub is removed in ``_terminar``.
+    output = _reservar_salida(DESKTOP)
+
+    # Run the heavy work off the Tk thread; status updates are marshalled
+    # back onto the event loop with ``root.after``.
+    boton.config(state="disabled")
+    status_var.set("Generando...")
+    futuro = EXECUTOR.submit(
+        funcion, progresion_texto, midi_ref, output, armonizacion
+    )
+
+    def _terminar(f) -> None:
+        def _aplicar() -> None:
+            boton.config(state="normal")
+            exc = f.exception()
+            if exc is not None:
+                # Libera el archivo reservado para no acumular stubs vacíos
+                output.unlink(missing_ok=True)
+                status_var.set(f"Error: {exc}")
+            else:
+                status_var.set(f"MIDI generado: {output}")
+
+        root.after(0, _aplicar)
+
+    futuro.add_done_callback(_terminar)
 
 
 def main():
+    # Silence per-note debug logging unless explicitly enabled
+    logging.basicConfig(level=logging.WARNING)
+
     root = Tk()
     root.title("Generador de Montunos")
 
@@ -107,11 +199,7 @@ def main():
 
     def actualizar_midi() -> None:
         """Update the reference MIDI label according to clave and variation."""
-        cfg = CLAVES[clave_var.get()]
-        variacion = variacion_var.get()
-        midi_var.set(
-            f"reference_midi_loops/{cfg['midi_prefix']}_{variacion}.mid"
-        )
+        midi_var.set(MIDI_LABELS[(clave_var.get(), variacion_var.get())])
 
     Label(root, text="Progresión de acordes:").pack(anchor="w")
     texto = Text(root, width=40, height=4)
@@ -143,27 +231,40 @@ def main():
     actualizar_midi()
 
     Label(root, text="Modo:").pack(anchor="w", pady=(10, 0))
-    modo_combo = ttk.Combobox(root, values=list(MODOS_DISPONIBLES.keys()))
+    modo_combo = ttk.Combobox(root, values=["Cargando..."])
     modo_combo.current(0)
     modo_combo.pack(fill="x", padx=5)
 
+    def _cargar_modos() -> None:
+        """Fill the mode list once the window has painted."""
+        from modos import MODOS_DISPONIBLES
+
+        modo_combo["values"] = list(MODOS_DISPONIBLES.keys())
+        modo_combo.current(0)
+
+    # Deferred so the heavyweight imports behind ``modos`` don't delay the
+    # first paint of the window.
+    root.after(50, _cargar_modos)
+
     Label(root, text="Armonización:").pack(anchor="w", pady=(10, 0))
     armon_combo = ttk.Combobox(root, values=ARMONIZACIONES)
     armon_combo.current(0)
     armon_combo.pack(fill="x", padx=5)
 
-    Button(
-        root,
-        text="Generar",
+    boton = Button(root, text="Generar")
+    boton.config(
         command=lambda: generar(
+            root,
+            boton,
             status_var,
             clave_var,
             variacion_var,
             texto,
             modo_combo,
             armon_combo,
-        ),
-    ).pack(pady=10)
+        )
+    )
+    boton.pack(pady=10)
     Label(root, textvariable=status_var).pack(pady=(5, 0))
 
     root.mainloop()
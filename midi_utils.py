@@ -1,52 +1,322 @@
 """Helpers for reading, manipulating and exporting MIDI files."""
 
+import bisect
+import functools
+import logging
+import re
+import struct
+
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
+import mido
+import numpy as np
 import pretty_midi
 from voicings import parsear_nombre_acorde, INTERVALOS_TRADICIONALES
 
+logger = logging.getLogger(__name__)
+
 # Baseline notes present in the reference MIDI to be replaced by generated voicings
 NOTAS_BASE = [55, 57, 60, 64]  # G3, A3, C4, E4
 
+# Set counterpart for O(1) membership tests on the reading hot path
+_NOTAS_BASE_SET = frozenset(NOTAS_BASE)
+
+# Array counterpart for vectorized np.isin masks
+_NOTAS_BASE_ARR = np.array(NOTAS_BASE, dtype=np.int16)
+
+# pitch → slot within the voicing, so hot loops avoid list.index scans
+NOTAS_BASE_INDEX = {p: i for i, p in enumerate(NOTAS_BASE)}
+
+# 128-entry pitch → slot table (−1 = not a baseline pitch) for vectorized
+# gathers over whole pitch columns
+_ORDEN_TABLA = np.full(128, -1, dtype=np.int8)
+_ORDEN_TABLA[NOTAS_BASE] = np.arange(len(NOTAS_BASE), dtype=np.int8)
+
+# Columnar (SoA) layout for reference note positions: cheaper per note than
+# a dict and sortable at C speed with ``sort(order=...)``.
+_POSICIONES_DTYPE = np.dtype(
+    [("pitch", "i2"), ("start", "f8"), ("end", "f8"), ("velocity", "i2")]
+)
+
+def _indices_corchea(tiempos: np.ndarray, grid_seg: float) -> np.ndarray:
+    """Convierte un vector de tiempos en índices de corchea.
+
+    Redondea toda la columna de una vez en NumPy; los kernels comparten esta
+    conversión para que el cuantizado sea idéntico en todos ellos.
+    """
+
+    return np.rint(tiempos / grid_seg).astype(np.int64)
+
+
+# note_number_to_name rebuilds its string on every call; memoized here since
+# the debug paths look up the same 128 pitches over and over.
+_nombre_nota = functools.lru_cache(maxsize=128)(pretty_midi.note_number_to_name)
+
+# Separador de segmentos de la progresión: parte por ``|`` comiéndose los
+# espacios adyacentes en la misma pasada, evitando el strip por segmento.
+_SEPARADOR_SEGMENTOS = re.compile(r"\s*\|\s*")
+
+# Marcadores de armonización intercalados en la progresión, p. ej. "(10)Cm7";
+# compilados y mapeados una vez en vez de por token.
+_MARCA_ARMONIZACION = re.compile(r"^\((8|10|13|15)\)(.*)$")
+_ARMONIZACION_POR_CODIGO = {
+    "8": "Octavas",
+    "15": "Doble octava",
+    "10": "Décimas",
+    "13": "Treceavas",
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _info_acorde(nombre: str) -> Tuple[int, List[int], bool, bool, str]:
+    """Datos derivados de un nombre de acorde, memoizados por nombre.
+
+    Las progresiones repiten acordes constantemente, así que el parseo y las
+    banderas (sexta, disminuido) se calculan una sola vez por nombre.
+    """
+
+    root_pc, suf = parsear_nombre_acorde(nombre)
+    ints = INTERVALOS_TRADICIONALES[suf]
+    is_sixth = suf.endswith("6") and "7" not in suf
+    is_dim7 = suf == "º7"
+    return root_pc, ints, is_sixth, is_dim7, suf
+
 
 # ==========================================================================
 # MIDI reading utilities
 # ==========================================================================
 
+def leer_midi_referencia_fast(midi_path: Path):
+    """Minimal SMF reader for the reference loops.
+
+    ``pretty_midi`` builds a full timing model (tempo map, ticks array,
+    per-event objects) which is overkill here: the reference loops only use
+    one instrument and at most a couple of tempo events.  This reader walks
+    the raw bytes of the file directly, accumulating delta ticks and
+    converting to seconds with a piecewise tempo map built from the
+    ``set_tempo`` meta events, using the same float expressions as
+    pretty_midi so note times stay bit-identical to the previous reader.
+
+    Returns ``(notas, bpm, program, name)`` where ``notas`` is a list of
+    ``(pitch, start, end, velocity)`` tuples sorted by start time.
+    ``pretty_midi`` remains in use only on the write path.
+    """
+
+    data = midi_path.read_bytes()
+    if data[:4] != b"MThd":
+        raise ValueError(f"No es un archivo MIDI estándar: {midi_path}")
+    hlen, _fmt, num_pistas, division = struct.unpack(">IHHH", data[4:14])
+    if division & 0x8000:
+        raise ValueError(f"División SMPTE no soportada: {midi_path}")
+
+    pos = 8 + hlen
+    tempos: List[Tuple[int, int]] = []  # (tick, tempo_us) en orden de archivo
+    program = 0
+    name = ""
+    eventos: List[Tuple[int, int, int, int]] = []  # (pitch, tick_on, tick_off, vel)
+
+    for _ in range(num_pistas):
+        if data[pos:pos + 4] != b"MTrk":
+            raise ValueError(f"Cabecera de pista inválida: {midi_path}")
+        fin_pista = pos + 8 + struct.unpack(">I", data[pos + 4:pos + 8])[0]
+        i = pos + 8
+        tick = 0
+        status = 0
+        abiertas: dict[int, List[Tuple[int, int]]] = {}
+        while i < fin_pista:
+            # delta time (variable-length quantity)
+            delta = 0
+            while True:
+                b = data[i]
+                i += 1
+                delta = (delta << 7) | (b & 0x7F)
+                if not b & 0x80:
+                    break
+            tick += delta
+            b = data[i]
+            if b & 0x80:
+                status = b
+                i += 1
+            tipo = status & 0xF0
+            if tipo in (0x80, 0x90):  # note off / note on
+                pitch, vel = data[i], data[i + 1]
+                i += 2
+                if tipo == 0x90 and vel > 0:
+                    abiertas.setdefault(pitch, []).append((tick, vel))
+                elif abiertas.get(pitch):
+                    # Close every open note at this pitch (keeping any that
+                    # started on this very tick), mirroring pretty_midi's
+                    # pairing of overlapping identical pitches.
+                    pendientes = abiertas[pitch]
+                    for tick_on, vel_on in pendientes:
+                        if tick_on != tick:
+                            eventos.append((pitch, tick_on, tick, vel_on))
+                    pendientes = [t for t in pendientes if t[0] == tick]
+                    if pendientes:
+                        abiertas[pitch] = pendientes
+                    else:
+                        del abiertas[pitch]
+            elif tipo in (0xA0, 0xB0, 0xE0):
+                i += 2
+            elif tipo == 0xC0:
+                program = data[i]
+                i += 1
+            elif tipo == 0xD0:
+                i += 1
+            elif status in (0xFF, 0xF0, 0xF7):  # meta / sysex
+                meta = data[i] if status == 0xFF else None
+                if status == 0xFF:
+                    i += 1
+                largo = 0
+                while True:
+                    b = data[i]
+                    i += 1
+                    largo = (largo << 7) | (b & 0x7F)
+                    if not b & 0x80:
+                        break
+                if meta == 0x51:  # set_tempo
+                    tempos.append(
+                        (tick, int.from_bytes(data[i:i + largo], "big"))
+                    )
+                elif meta == 0x03 and not name:
+                    name = data[i:i + largo].decode("latin-1")
+                i += largo
+            else:
+                raise ValueError(
+                    f"Evento MIDI inesperado ({status:#x}) en {midi_path}"
+                )
+        pos = fin_pista
+
+    # Mapa de tempo con la misma aritmética que pretty_midi: 120 bpm hasta el
+    # primer evento, un evento en tick 0 reemplaza la escala inicial y los
+    # posteriores abren un tramo nuevo desde su tick.
+    bpm = 120.0
+    escalas: List[Tuple[int, float]] = [(0, 60.0 / (120.0 * division))]
+    for tick_t, t_us in sorted(tempos):
+        escala = 60.0 / ((6e7 / t_us) * division)
+        if tick_t == 0:
+            escalas[0] = (0, escala)
+            bpm = 6e7 / t_us
+        elif escala != escalas[-1][1]:
+            escalas.append((tick_t, escala))
+
+    if len(escalas) == 1:
+        # Caso habitual de los loops de referencia: un solo tempo efectivo.
+        seg_por_tick = escalas[0][1]
+        notas = [
+            (p, t0 * seg_por_tick, t1 * seg_por_tick, v)
+            for p, t0, t1, v in eventos
+        ]
+    else:
+        # Tiempo base acumulado al inicio de cada tramo, como el
+        # ``tick_to_time`` de pretty_midi pero sin materializar el array.
+        ticks_tramo = [t for t, _ in escalas]
+        bases = [0.0]
+        for (t0, esc), (t1, _) in zip(escalas, escalas[1:]):
+            bases.append(bases[-1] + esc * (t1 - t0))
+
+        def _tick_a_seg(tick: int) -> float:
+            j = bisect.bisect_right(ticks_tramo, tick) - 1
+            t0, esc = escalas[j]
+            return bases[j] + esc * (tick - t0)
+
+        notas = [
+            (p, _tick_a_seg(t0), _tick_a_seg(t1), v) for p, t0, t1, v in eventos
+        ]
+    # Reference loops close notes nearly in onset order, so one monotonic
+    # pass usually makes the sort a no-op; itemgetter keeps the key callable
+    # in C when sorting is needed.
+    if any(a[1] > b[1] for a, b in zip(notas, notas[1:])):
+        notas.sort(key=itemgetter(1))
+    return notas, bpm, program, name
+
+
+@functools.lru_cache(maxsize=32)
+def _cargar_referencia(midi_path_str: str, mtime_ns: int):
+    """Parse a reference MIDI once and memoize everything derived from it.
+
+    The cache key includes the file's ``st_mtime_ns`` so editing a reference
+    loop on disk invalidates the entry automatically.  Notes are stored as
+    plain ``(pitch, start, end, velocity)`` tuples so callers can rebuild
+    mutable ``pretty_midi.Note`` objects cheaply without re-parsing the file.
+
+    Returns ``(notas_planas, posiciones_planas, total_cor, grid, bpm,
+    instrumento)`` where ``instrumento`` is ``(program, name)``.
+    """
+
+    notas, bpm, program, name = leer_midi_referencia_fast(Path(midi_path_str))
+    notas_planas = tuple(notas)
+    # Positions of the baseline notes, pre-filtered and pre-sorted so
+    # ``exportar_montuno`` pays the I/O and parse cost only once per file.
+    # Stored as a read-only structured array (SoA) shared by all callers.
+    posiciones_planas = np.fromiter(
+        (t for t in notas_planas if t[0] in _NOTAS_BASE_SET),
+        dtype=_POSICIONES_DTYPE,
+    )
+    posiciones_planas.sort(order=("start", "pitch"))
+    posiciones_planas.flags.writeable = False
+    grid = 60.0 / bpm / 2  # seconds per eighth note
+    fin = max((t[2] for t in notas_planas), default=0.0)
+    total_cor = int(round(fin / grid))
+    return notas_planas, posiciones_planas, total_cor, grid, bpm, (program, name)
+
+
+def _referencia_cacheada(midi_path: Path):
+    """Cache-aware accessor for :func:`_cargar_referencia`."""
+
+    return _cargar_referencia(str(midi_path), midi_path.stat().st_mtime_ns)
+
+
 def leer_midi_referencia(midi_path: Path):
-    """Load reference MIDI and return its notes and the PrettyMIDI object."""
-    pm = pretty_midi.PrettyMIDI(str(midi_path))
-    # use the first instrument only
-    instrumento = pm.instruments[0]
-    # ensure notes are ordered by start time
-    notes = sorted(instrumento.notes, key=lambda n: n.start)
-    for n in notes:
-        nombre = pretty_midi.note_number_to_name(int(n.pitch))
-        print(f"{n.pitch} ({nombre})")
-    print(f"Total de notas: {len(notes)}")
-    return notes, pm
-
-
-def obtener_posiciones_referencia(notes) -> List[dict]:
-    """Return pitch, start, end and velocity for baseline notes in the reference."""
-    posiciones = []
-    for n in notes:
-        pitch = int(n.pitch)
-        if pitch in [int(p) for p in NOTAS_BASE]:
-            posiciones.append(
-                {
-                    "pitch": pitch,
-                    "start": n.start,
-                    "end": n.end,
-                    "velocity": n.velocity,
-                }
-            )
-            nombre = pretty_midi.note_number_to_name(pitch)
-            print(f"Nota base {pitch} ({nombre}) inicio {n.start}")
-    posiciones.sort(key=lambda x: (x["start"], x["pitch"]))
-    print(f"Notas base encontradas: {len(posiciones)}")
-    ejemplo = [(p['pitch'], p['start']) for p in posiciones[:10]]
-    print(f"Ejemplo primeros 10: {ejemplo}")
+    """Load reference MIDI and return its notes as ``pretty_midi.Note``."""
+    notas_planas, _, _, _, _, _ = _referencia_cacheada(midi_path)
+    Note = pretty_midi.Note
+    notes = [Note(v, p, s, e) for p, s, e, v in notas_planas]
+    # note_number_to_name is regex-based; skip it entirely unless debugging,
+    # and emit one batched record instead of a flush per note
+    if logger.isEnabledFor(logging.DEBUG):
+        lineas = [
+            f"{n.pitch} ({_nombre_nota(int(n.pitch))})"
+            for n in notes
+        ]
+        lineas.append(f"Total de notas: {len(notes)}")
+        logger.debug("%s", "\n".join(lineas))
+    return notes
+
+
+def obtener_posiciones_referencia(notes) -> np.ndarray:
+    """Return pitch, start, end and velocity for baseline notes in the reference.
+
+    The result is a structured array with fields ``pitch``, ``start``, ``end``
+    and ``velocity`` (see ``_POSICIONES_DTYPE``) sorted by start then pitch,
+    replacing the previous list-of-dicts layout.
+    """
+    total = len(notes)
+    pitches = np.fromiter((n.pitch for n in notes), dtype=np.int16, count=total)
+    starts = np.fromiter((n.start for n in notes), dtype=np.float64, count=total)
+    ends = np.fromiter((n.end for n in notes), dtype=np.float64, count=total)
+    vels = np.fromiter((n.velocity for n in notes), dtype=np.int16, count=total)
+
+    # One vectorized membership mask instead of a per-note Python test
+    mascara = np.isin(pitches, _NOTAS_BASE_ARR)
+    posiciones = np.empty(int(mascara.sum()), dtype=_POSICIONES_DTYPE)
+    posiciones["pitch"] = pitches[mascara]
+    posiciones["start"] = starts[mascara]
+    posiciones["end"] = ends[mascara]
+    posiciones["velocity"] = vels[mascara]
+    posiciones.sort(order=("start", "pitch"))
+    if logger.isEnabledFor(logging.DEBUG):
+        lineas = [
+            f"Nota base {pitch} ({_nombre_nota(int(pitch))})"
+            f" inicio {start}"
+            for pitch, start in zip(posiciones["pitch"], posiciones["start"])
+        ]
+        lineas.append(f"Notas base encontradas: {len(posiciones)}")
+        ejemplo = list(zip(posiciones["pitch"][:10], posiciones["start"][:10]))
+        lineas.append(f"Ejemplo primeros 10: {ejemplo}")
+        logger.debug("%s", "\n".join(lineas))
     return posiciones
 
 
@@ -58,40 +328,66 @@ def obtener_posiciones_referencia(notes) -> List[dict]:
 # ---------------------------------------------------------------------------
 
 def construir_posiciones_secuenciales(
-    posiciones_base: List[dict],
+    posiciones_base: np.ndarray,
     total_cor_dest: int,
     total_cor_ref: int,
     grid_seg: float,
-) -> List[dict]:
-    """Build note positions repeating the reference sequentially."""
-
-    grupos_ref: List[List[dict]] = [[] for _ in range(total_cor_ref)]
-    for pos in posiciones_base:
-        idx = int(round(pos["start"] / grid_seg))
-        if 0 <= idx < total_cor_ref:
-            grupos_ref[idx].append(
-                {
-                    "pitch": pos["pitch"],
-                    "start": pos["start"] - idx * grid_seg,
-                    "end": pos["end"] - idx * grid_seg,
-                    "velocity": pos["velocity"],
-                }
-            )
+) -> np.ndarray:
+    """Build note positions repeating the reference sequentially.
+
+    The reference is treated as a loop of ``total_cor_ref`` eighth notes that
+    is tiled across ``total_cor_dest`` destination eighths.  Instead of
+    looping note by note in Python, the reference columns are broadcast
+    against the per-cycle time offsets with NumPy, producing all starts and
+    ends in a handful of array operations.  The result keeps the columnar
+    ``_POSICIONES_DTYPE`` layout end to end.
+    """
 
-    posiciones: List[dict] = []
-    for dest_idx in range(total_cor_dest):
-        ref_idx = dest_idx % total_cor_ref
-        for nota in grupos_ref[ref_idx]:
-            posiciones.append(
-                {
-                    "pitch": nota["pitch"],
-                    "start": dest_idx * grid_seg + nota["start"],
-                    "end": dest_idx * grid_seg + nota["end"],
-                    "velocity": nota["velocity"],
-                }
-            )
+    if len(posiciones_base) == 0 or total_cor_dest <= 0 or total_cor_ref <= 0:
+        return np.empty(0, dtype=_POSICIONES_DTYPE)
 
-    posiciones.sort(key=lambda x: (x["start"], x["pitch"]))
+    # Caso "sin repetición": el destino cubre exactamente una pasada de la
+    # referencia, cuyas posiciones ya vienen ordenadas y dentro de rango.
+    if total_cor_dest == total_cor_ref:
+        return posiciones_base
+
+    pitch = posiciones_base["pitch"].astype(np.int64)
+    start = posiciones_base["start"].astype(np.float64)
+    end = posiciones_base["end"].astype(np.float64)
+    velocity = posiciones_base["velocity"].astype(np.int64)
+
+    ref_idx = _indices_corchea(start, grid_seg)
+    valida = (ref_idx >= 0) & (ref_idx < total_cor_ref)
+    pitch, start, end, velocity, ref_idx = (
+        a[valida] for a in (pitch, start, end, velocity, ref_idx)
+    )
+
+    # ``ciclos`` full copies of the loop plus an optional partial copy that
+    # only keeps the notes falling before the remaining eighth count.
+    ciclos, resto = divmod(total_cor_dest, total_cor_ref)
+    copias = ciclos + (1 if resto else 0)
+    desplaz = np.arange(copias, dtype=np.float64) * (total_cor_ref * grid_seg)
+
+    starts = np.add.outer(desplaz, start).ravel()
+    ends = np.add.outer(desplaz, end).ravel()
+    pitches = np.tile(pitch, copias)
+    velocities = np.tile(velocity, copias)
+
+    if resto:
+        completa = np.ones(starts.shape, dtype=bool)
+        completa[ciclos * len(start):] = ref_idx < resto
+        starts, ends, pitches, velocities = (
+            a[completa] for a in (starts, ends, pitches, velocities)
+        )
+
+    # ``posiciones_base`` llega ordenado por (start, pitch) y cada copia se
+    # desplaza un ciclo completo hacia adelante, así que la concatenación ya
+    # sale ordenada; no hace falta un lexsort final.
+    posiciones = np.empty(len(starts), dtype=_POSICIONES_DTYPE)
+    posiciones["pitch"] = pitches
+    posiciones["start"] = starts
+    posiciones["end"] = ends
+    posiciones["velocity"] = velocities
     return posiciones
 
 
@@ -100,9 +396,9 @@ def construir_posiciones_secuenciales(
 # ==========================================================================
 
 def aplicar_voicings_a_referencia(
-    posiciones: List[dict],
+    posiciones: np.ndarray,
     voicings: List[List[int]],
-    asignaciones: List[Tuple[str, List[int]]],
+    asignaciones: List[Tuple[str, Sequence[int]]],
     grid_seg: float,
     *,
     debug: bool = False,
@@ -112,37 +408,62 @@ def aplicar_voicings_a_referencia(
     Devuelve la lista de nuevas notas y el último índice de corchea utilizado.
     """
 
-    # Mapeo corchea → índice de voicing
-    mapa: dict[int, int] = {}
-    max_idx = -1
+    # Mapeo corchea → índice de voicing como array plano: indexar evita el
+    # hashing del dict en cada nota (−1 marca silencio).
+    # ``procesar_progresion_en_grupos`` asigna índices monótonos, así que el
+    # último índice de la última asignación ya es el máximo; el escaneo
+    # completo queda como respaldo para asignaciones arbitrarias.
+    if asignaciones and len(asignaciones[-1][1]):
+        max_idx = asignaciones[-1][1][-1]
+    else:
+        max_idx = max((ix for _, idxs in asignaciones for ix in idxs), default=-1)
+    if max_idx < 0 or len(posiciones) == 0:
+        return [], max_idx
+    mapa_arr = np.full(max_idx + 1, -1, dtype=np.int32)
     for i, (_, idxs) in enumerate(asignaciones):
-        for ix in idxs:
-            mapa[ix] = i
-            if ix > max_idx:
-                max_idx = ix
-
-    nuevas_notas: List[pretty_midi.Note] = []
+        # Los índices llegan como range contiguos; la asignación por slice
+        # evita materializarlos como array intermedio.
+        if isinstance(idxs, range):
+            mapa_arr[idxs.start:idxs.stop] = i
+        else:
+            mapa_arr[idxs] = i
+
+    # Each voicing sorted once, packed as a (K, 4) matrix for the gather
+    voicings_arr = np.array([sorted(v) for v in voicings], dtype=np.int16)
+
+    # Integer kernel over the SoA columns: eighth index, voicing index and
+    # slot are resolved for the whole batch without touching the
+    # interpreter, leaving only Note construction per surviving note.
+    starts = np.asarray(posiciones["start"], dtype=np.float64)
+    corcheas = _indices_corchea(starts, grid_seg)
+    validos = (corcheas >= 0) & (corcheas <= max_idx)
+    idx_voicing = np.where(validos, mapa_arr[np.clip(corcheas, 0, max(max_idx, 0))], -1)
+    validos &= idx_voicing >= 0
+
+    ordenes = _ORDEN_TABLA[np.asarray(posiciones["pitch"], dtype=np.int64)]
+    sel = np.nonzero(validos)[0]
+    nuevos_pitches = voicings_arr[idx_voicing[sel], ordenes[sel]]
+
+    # The velocity of the reference note is preserved so dynamics match.
+    Note = pretty_midi.Note
+    nuevas_notas = [
+        Note(v, p, s, e)
+        for v, p, s, e in zip(
+            np.asarray(posiciones["velocity"])[sel].tolist(),
+            nuevos_pitches.tolist(),
+            starts[sel].tolist(),
+            np.asarray(posiciones["end"])[sel].tolist(),
+        )
+    ]
 
-    for pos in posiciones:
-        corchea = int(round(pos["start"] / grid_seg))
-        if corchea not in mapa:
-            if debug:
+    if debug:
+        pitches_ref = np.asarray(posiciones["pitch"]).tolist()
+        nuevos = dict(zip(sel.tolist(), nuevos_pitches.tolist()))
+        for i, corchea in enumerate(corcheas.tolist()):
+            if i in nuevos:
+                print(f"Corchea {corchea}: nota base {pitches_ref[i]} -> {nuevos[i]}")
+            else:
                 print(f"Corchea {corchea}: silencio")
-            continue  # silencio
-        voicing = sorted(voicings[mapa[corchea]])
-        orden = NOTAS_BASE.index(pos["pitch"])  # posición dentro del voicing
-        # Preserve the velocity of the reference note so dynamics match
-        nueva_nota = pretty_midi.Note(
-            velocity=pos["velocity"],
-            pitch=voicing[orden],
-            start=pos["start"],
-            end=pos["end"],
-        )
-        if debug:
-            print(
-                f"Corchea {corchea}: nota base {pos['pitch']} -> {nueva_nota.pitch}"
-            )
-        nuevas_notas.append(nueva_nota)
 
     return nuevas_notas, max_idx
 
@@ -150,51 +471,36 @@ def aplicar_voicings_a_referencia(
 def _arm_octavas(notas: List[pretty_midi.Note]) -> List[pretty_midi.Note]:
     """Duplicate each note one octave above."""
 
-    resultado: List[pretty_midi.Note] = []
-    for n in notas:
-        resultado.append(n)
-        if n.pitch > 0:
-            resultado.append(
-                pretty_midi.Note(
-                    velocity=n.velocity,
-                    pitch=n.pitch + 12,
-                    start=n.start,
-                    end=n.end,
-                )
-            )
-    return resultado
+    Note = pretty_midi.Note  # local bind keeps the lookup out of the loop
+    return list(
+        chain.from_iterable(
+            (n,) if n.pitch <= 0 else (n, Note(n.velocity, n.pitch + 12, n.start, n.end))
+            for n in notas
+        )
+    )
 
 
 def _arm_doble_octava(notas: List[pretty_midi.Note]) -> List[pretty_midi.Note]:
     """Create notes an octave below and above, without keeping the original."""
 
-    resultado: List[pretty_midi.Note] = []
-    for n in notas:
-        if n.pitch > 0:
-            # Copy the velocity from the original note
-            resultado.append(
-                pretty_midi.Note(
-                    velocity=n.velocity,
-                    pitch=n.pitch - 12,
-                    start=n.start,
-                    end=n.end,
-                )
+    # Copy the velocity from the original note
+    Note = pretty_midi.Note
+    return list(
+        chain.from_iterable(
+            (
+                Note(n.velocity, n.pitch - 12, n.start, n.end),
+                Note(n.velocity, n.pitch + 12, n.start, n.end),
             )
-            resultado.append(
-                pretty_midi.Note(
-                    velocity=n.velocity,
-                    pitch=n.pitch + 12,
-                    start=n.start,
-                    end=n.end,
-                )
-            )
-    return resultado
+            for n in notas
+            if n.pitch > 0
+        )
+    )
 
 
 def _arm_por_parejas(
-    posiciones: List[dict],
+    posiciones: np.ndarray,
     voicings: List[List[int]],
-    asignaciones: List[Tuple[str, List[int]]],
+    asignaciones: List[Tuple[str, Sequence[int]]],
     grid_seg: float,
     salto: int,
     *,
@@ -216,9 +522,13 @@ def _arm_por_parejas(
             mapa[ix] = i
 
     # Counter so each chord advances through its voicing in parallel
-    contadores: dict[int, int] = {}
+    contadores = [0] * len(asignaciones)
 
-    resultado: List[pretty_midi.Note] = []
+    # Loop-invariant hoist: each voicing is sorted once, not once per note
+    voicings_ordenados = [sorted(v) for v in voicings]
+
+    Note = pretty_midi.Note
+    resultado: List[Note] = []
     for pos in posiciones:
         corchea = int(round(pos["start"] / grid_seg))
         if corchea not in mapa:
@@ -227,10 +537,10 @@ def _arm_por_parejas(
             continue
 
         idx_voicing = mapa[corchea]
-        paso = contadores.get(idx_voicing, 0)
+        paso = contadores[idx_voicing]
         contadores[idx_voicing] = paso + 1
 
-        voicing = sorted(voicings[idx_voicing])
+        voicing = voicings_ordenados[idx_voicing]
 
         if salto == 1:  # décimas
             principal = voicing[paso % 4]
@@ -246,14 +556,7 @@ def _arm_por_parejas(
             agregada += 12
 
         for pitch in (principal, agregada):
-            resultado.append(
-                pretty_midi.Note(
-                    velocity=pos["velocity"],
-                    pitch=pitch,
-                    start=pos["start"],
-                    end=pos["end"],
-                )
-            )
+            resultado.append(Note(pos["velocity"], pitch, pos["start"], pos["end"]))
 
         if debug:
             print(
@@ -264,9 +567,9 @@ def _arm_por_parejas(
 
 
 def _arm_decimas_intervalos(
-    posiciones: List[dict],
+    posiciones: np.ndarray,
     voicings: List[List[int]],
-    asignaciones: List[Tuple[str, List[int]]],
+    asignaciones: List[Tuple[str, Sequence[int]]],
     grid_seg: float,
     *,
     debug: bool = False,
@@ -301,10 +604,7 @@ def _arm_decimas_intervalos(
 
     info: list[dict] = []
     for nombre, _ in asignaciones:
-        root_pc, suf = parsear_nombre_acorde(nombre)
-        ints = INTERVALOS_TRADICIONALES[suf]
-        is_sixth = suf.endswith("6") and "7" not in suf
-        is_dim7 = suf == "º7"
+        root_pc, ints, is_sixth, is_dim7, suf = _info_acorde(nombre)
         info.append(
             {
                 "root_pc": root_pc,
@@ -315,11 +615,17 @@ def _arm_decimas_intervalos(
             }
         )
 
-    contadores: dict[int, int] = {}
-    offsets: dict[int, int] = {}
+    # Loop-invariant hoist: each voicing is sorted once, not once per note
+    voicings_ordenados = [sorted(v) for v in voicings]
+
+    # Contadores densos por acorde: indexar una lista evita dos hashes de
+    # dict por posición.
+    contadores = [0] * len(asignaciones)
+    offsets = [0] * len(asignaciones)
     bajo_anterior: int | None = None
     arm_anterior: str | None = None
-    resultado: List[pretty_midi.Note] = []
+    Note = pretty_midi.Note
+    resultado: List[Note] = []
 
     for pos in posiciones:
         corchea = int(round(pos["start"] / grid_seg))
@@ -329,11 +635,12 @@ def _arm_decimas_intervalos(
             continue
 
         idx = mapa[corchea]
-        paso = contadores.get(idx, 0)
+
+        paso = contadores[idx]
         contadores[idx] = paso + 1
 
         datos = info[idx]
-        voicing = sorted(voicings[idx])
+        voicing = voicings_ordenados[idx]
         base = voicing[paso % 4]
         root_pc = datos["root_pc"]
         ints = datos["intervals"]
@@ -393,27 +700,20 @@ def _arm_decimas_intervalos(
         if debug:
             print(
                 f"Corchea {corchea}: paso {paso} {asignaciones[idx][0]} "
-                f"{pretty_midi.note_number_to_name(base)} ({func}) -> "
-                f"{pretty_midi.note_number_to_name(agregada)}"
+                f"{_nombre_nota(base)} ({func}) -> "
+                f"{_nombre_nota(agregada)}"
             )
 
         for pitch in (base, agregada):
-            resultado.append(
-                pretty_midi.Note(
-                    velocity=pos["velocity"],
-                    pitch=pitch,
-                    start=pos["start"],
-                    end=pos["end"],
-                )
-            )
+            resultado.append(Note(pos["velocity"], pitch, pos["start"], pos["end"]))
 
     return resultado
 
 
 def _arm_treceavas_intervalos(
-    posiciones: List[dict],
+    posiciones: np.ndarray,
     voicings: List[List[int]],
-    asignaciones: List[Tuple[str, List[int]]],
+    asignaciones: List[Tuple[str, Sequence[int]]],
     grid_seg: float,
     *,
     debug: bool = False,
@@ -432,10 +732,7 @@ def _arm_treceavas_intervalos(
 
     info: list[dict] = []
     for nombre, _ in asignaciones:
-        root_pc, suf = parsear_nombre_acorde(nombre)
-        ints = INTERVALOS_TRADICIONALES[suf]
-        is_sixth = suf.endswith("6") and "7" not in suf
-        is_dim7 = suf == "º7"
+        root_pc, ints, is_sixth, is_dim7, suf = _info_acorde(nombre)
         info.append(
             {
                 "root_pc": root_pc,
@@ -446,11 +743,17 @@ def _arm_treceavas_intervalos(
             }
         )
 
-    contadores: dict[int, int] = {}
-    offsets: dict[int, int] = {}
+    # Loop-invariant hoist: each voicing is sorted once, not once per note
+    voicings_ordenados = [sorted(v) for v in voicings]
+
+    # Contadores densos por acorde: indexar una lista evita dos hashes de
+    # dict por posición.
+    contadores = [0] * len(asignaciones)
+    offsets = [0] * len(asignaciones)
     bajo_anterior: int | None = None
     arm_anterior: str | None = None
-    resultado: List[pretty_midi.Note] = []
+    Note = pretty_midi.Note
+    resultado: List[Note] = []
 
     for pos in posiciones:
         corchea = int(round(pos["start"] / grid_seg))
@@ -460,11 +763,12 @@ def _arm_treceavas_intervalos(
             continue
 
         idx = mapa[corchea]
-        paso = contadores.get(idx, 0)
+
+        paso = contadores[idx]
         contadores[idx] = paso + 1
 
         datos = info[idx]
-        voicing = sorted(voicings[idx])
+        voicing = voicings_ordenados[idx]
         base = voicing[paso % 4]
         root_pc = datos["root_pc"]
         ints = datos["intervals"]
@@ -517,19 +821,12 @@ def _arm_treceavas_intervalos(
         if debug:
             print(
                 f"Corchea {corchea}: paso {paso} -> "
-                f"{pretty_midi.note_number_to_name(principal)} / "
-                f"{pretty_midi.note_number_to_name(inferior)}"
+                f"{_nombre_nota(principal)} / "
+                f"{_nombre_nota(inferior)}"
             )
 
         for pitch in (principal, inferior):
-            resultado.append(
-                pretty_midi.Note(
-                    velocity=pos["velocity"],
-                    pitch=pitch,
-                    start=pos["start"],
-                    end=pos["end"],
-                )
-            )
+            resultado.append(Note(pos["velocity"], pitch, pos["start"], pos["end"]))
 
     return resultado
 
@@ -561,69 +858,52 @@ def _ajustar_salto(prev_pitch: int | None, pitch: int) -> int:
 
 
 def generar_notas_mixtas(
-    posiciones: List[dict],
+    posiciones: np.ndarray,
     voicings: List[List[int]],
-    asignaciones: List[Tuple[str, List[int], str]],
+    asignaciones: List[Tuple[str, Sequence[int], str]],
     grid_seg: float,
     *,
     debug: bool = False,
 ) -> List[pretty_midi.Note]:
     """Generate notes applying per-chord harmonisation.
 
-    ``asignaciones`` debe contener tuplas ``(acorde, indices, armonizacion)``.
+    ``posiciones`` es el array estructurado (SoA) que produce
+    :func:`construir_posiciones_secuenciales`; ``asignaciones`` debe contener
+    tuplas ``(acorde, indices, armonizacion)``.
     """
 
-    mapa: dict[int, int] = {}
+    # Mapeo corchea → acorde como array plano (−1 marca silencio): indexar
+    # evita el hashing del dict por nota, igual que en el kernel de voicings.
+    if asignaciones and len(asignaciones[-1][1]):
+        max_idx = asignaciones[-1][1][-1]
+    else:
+        max_idx = max((ix for _, idxs, _ in asignaciones for ix in idxs), default=-1)
+    mapa_arr = np.full(max_idx + 1, -1, dtype=np.int32)
     armonias: dict[int, str] = {}
     for i, (_, idxs, arm) in enumerate(asignaciones):
-        for ix in idxs:
-            mapa[ix] = i
+        if isinstance(idxs, range):
+            mapa_arr[idxs.start:idxs.stop] = i
+        else:
+            mapa_arr[idxs] = i
         armonias[i] = (arm or "").lower()
-
-    info: list[dict] = []
-    for nombre, _, _ in asignaciones:
-        root_pc, suf = parsear_nombre_acorde(nombre)
-        ints = INTERVALOS_TRADICIONALES[suf]
-        is_sixth = suf.endswith("6") and "7" not in suf
-        is_dim7 = suf == "º7"
-        info.append(
-            {
-                "root_pc": root_pc,
-                "intervals": ints,
-                "is_sixth": is_sixth,
-                "is_dim7": is_dim7,
-                "suf": suf,
-            }
-        )
-
-    contadores: dict[int, int] = {}
-    offsets: dict[int, int] = {}
-    bajo_anterior: int | None = None
-    arm_anterior: str | None = None
-    resultado: List[pretty_midi.Note] = []
-
-    for pos in posiciones:
-        corchea = int(round(pos["start"] / grid_seg))
-        if corchea not in mapa:
-            if debug:
-                print(f"Corchea {corchea}: silencio")
+    mapa = mapa_arr.tolist()
+
+    # Loop-invariant hoist: each voicing is sorted once, not once per note
+    voicings_ordenados = [sorted(v) for v in voicings]
+
+    # La clasificación funcional de décimas/treceavas depende sólo del acorde
+    # y del paso (mod 4), así que las parejas de voces se precomputan aquí por
+    # acorde y el bucle por nota se reduce a indexar la tabla.
+    parejas: list[tuple | None] = []
+    for i, (nombre, _, _) in enumerate(asignaciones):
+        arm = armonias[i]
+        if arm not in ("décimas", "treceavas"):
+            parejas.append(None)
             continue
-
-        idx = mapa[corchea]
-        arm = armonias.get(idx, "")
-        paso = contadores.get(idx, 0)
-        contadores[idx] = paso + 1
-        voicing = sorted(voicings[idx])
-
-        if arm in ("décimas", "treceavas"):
-            datos = info[idx]
-            base = voicing[paso % 4]
-            root_pc = datos["root_pc"]
-            ints = datos["intervals"]
-            is_sixth = datos["is_sixth"]
-            is_dim7 = datos["is_dim7"]
-            suf = datos["suf"]
-
+        root_pc, ints, is_sixth, is_dim7, suf = _info_acorde(nombre)
+        voicing = voicings_ordenados[i]
+        por_paso = []
+        for base in voicing[:4]:
             pc = base % 12
             if pc == (root_pc + ints[0]) % 12:
                 base_int = ints[0]
@@ -655,19 +935,56 @@ def generar_notas_mixtas(
                 func = "?"
 
             diff = (target_int - base_int) + (24 if func in ("6", "7") else 12)
-            # For flat nine the interval is forced to a minor tenth (15 semitones)
-            # above the principal voice even if it breaks range limits.
+            # For flat nine the interval is forced to a minor tenth
+            # (15 semitones) above the principal voice even if it breaks
+            # range limits.
             if func == "7" and target_int == 13:
                 diff = (target_int - base_int) + 12
             agregada = base + diff
 
             if arm == "décimas":
-                notas = [base, agregada]
+                por_paso.append((base, agregada))
             else:  # treceavas
-                notas = [base + 12, agregada - 24]
+                por_paso.append((base + 12, agregada - 24))
+        parejas.append(tuple(por_paso))
+
+    # Contadores densos por acorde: indexar una lista evita dos hashes de
+    # dict por posición.
+    contadores = [0] * len(asignaciones)
+    offsets = [0] * len(asignaciones)
+    bajo_anterior: int | None = None
+    arm_anterior: str | None = None
+    Note = pretty_midi.Note
+    resultado: List[Note] = []
+
+    # The eighth indices for the whole batch come from one vectorized pass
+    # over the SoA start column; ``tolist`` hands plain Python scalars to
+    # the stateful loop below.
+    corcheas = _indices_corchea(posiciones["start"], grid_seg).tolist()
+
+    for corchea, pitch_ref, start, end, velocity in zip(
+        corcheas,
+        posiciones["pitch"].tolist(),
+        posiciones["start"].tolist(),
+        posiciones["end"].tolist(),
+        posiciones["velocity"].tolist(),
+    ):
+        idx = mapa[corchea] if 0 <= corchea <= max_idx else -1
+        if idx < 0:
+            if debug:
+                print(f"Corchea {corchea}: silencio")
+            continue
+
+        arm = armonias.get(idx, "")
+        paso = contadores[idx]
+        contadores[idx] = paso + 1
+        voicing = voicings_ordenados[idx]
+
+        if arm in ("décimas", "treceavas"):
+            notas = parejas[idx][paso % 4]
         else:
             # Procesamiento estandar del voicing base
-            orden = NOTAS_BASE.index(pos["pitch"])
+            orden = NOTAS_BASE_INDEX[pitch_ref]
             base_pitch = voicing[orden]
 
             if arm == "octavas":
@@ -679,7 +996,7 @@ def generar_notas_mixtas(
             else:
                 notas = [base_pitch]
 
-        offset = offsets.get(idx, 0)
+        offset = offsets[idx]
         if paso == 0:
             bajo = min(notas)
             if arm != arm_anterior:
@@ -693,7 +1010,7 @@ def generar_notas_mixtas(
                 bajo_anterior = bajo + offset
                 arm_anterior = arm
         else:
-            offset = offsets.get(idx, 0)
+            offset = offsets[idx]
 
         if debug and paso == 0:
             print(
@@ -702,14 +1019,7 @@ def generar_notas_mixtas(
             )
 
         for pitch in notas:
-            resultado.append(
-                pretty_midi.Note(
-                    velocity=pos["velocity"],
-                    pitch=pitch + offset,
-                    start=pos["start"],
-                    end=pos["end"],
-                )
-            )
+            resultado.append(Note(velocity, pitch + offset, start, end))
 
     return resultado
 
@@ -740,17 +1050,18 @@ def _recortar_notas_a_limite(
 
     Cualquier nota que termine después del instante indicado se acorta para
     que su atributo ``end`` coincida exactamente con ``limite``.  Las notas
-    cuyo ``start`` es posterior al límite se descartan.
+    cuyo ``start`` es posterior al límite se descartan.  ``notas`` debe
+    venir ordenada por ``start`` (como la produce la generación), lo que
+    permite localizar el corte con ``bisect`` en vez de filtrar toda la
+    lista.
     """
 
-    recortadas: List[pretty_midi.Note] = []
+    corte = bisect.bisect_left(notas, limite, key=lambda n: n.start)
+    notas = notas[:corte]
     for n in notas:
-        if n.start >= limite:
-            continue
         if n.end > limite:
             n.end = limite
-        recortadas.append(n)
-    return recortadas
+    return notas
 
 
 def _cortar_notas_superpuestas(notas: List[pretty_midi.Note]) -> List[pretty_midi.Note]:
@@ -762,22 +1073,95 @@ def _cortar_notas_superpuestas(notas: List[pretty_midi.Note]) -> List[pretty_mid
     artefacts caused by overlapping identical pitches.
     """
 
-    agrupadas: dict[int, List[pretty_midi.Note]] = {}
-    for n in sorted(notas, key=lambda x: (x.pitch, x.start)):
-        lista = agrupadas.setdefault(n.pitch, [])
-        if lista and lista[-1].end > n.start:
-            lista[-1].end = n.start
-        lista.append(n)
+    total = len(notas)
+    if total < 2:
+        return list(notas)
 
-    resultado = [n for lst in agrupadas.values() for n in lst]
-    resultado.sort(key=lambda x: (x.start, x.pitch))
-    return resultado
+    # Un lexsort por (pitch, start) deja juntas las notas de cada altura;
+    # comparar cada una con su sucesora detecta todos los solapes en una
+    # pasada vectorizada en vez del dict de listas por pitch.
+    pitches = np.fromiter((n.pitch for n in notas), dtype=np.int16, count=total)
+    starts = np.fromiter((n.start for n in notas), dtype=np.float64, count=total)
+    ends = np.fromiter((n.end for n in notas), dtype=np.float64, count=total)
+
+    orden = np.lexsort((starts, pitches))
+    p_ord = pitches[orden]
+    s_ord = starts[orden]
+    solapa = (p_ord[:-1] == p_ord[1:]) & (ends[orden][:-1] > s_ord[1:])
+    for i in np.nonzero(solapa)[0].tolist():
+        notas[orden[i]].end = s_ord[i + 1]
+
+    final = np.lexsort((pitches, starts))
+    return [notas[i] for i in final.tolist()]
+
+
+# Tick resolution of the generated files (same default pretty_midi used)
+_RESOLUCION_SALIDA = 220
+
+
+def _escribir_montuno(
+    output_path: Path,
+    notas: List[pretty_midi.Note],
+    bpm: float,
+    program: int,
+    nombre_inst: str,
+) -> None:
+    """Serialize the generated notes straight to SMF with mido.
+
+    ``pretty_midi.PrettyMIDI.write`` rebuilds a tempo map and re-encodes
+    every event through its full abstraction; here the tempo is constant and
+    the notes are already final, so the events are emitted directly and the
+    file is written through a single 64 KiB-buffered handle.
+    """
+
+    escala = 60.0 / (bpm * _RESOLUCION_SALIDA)  # seconds per tick
+    # note_off sorts before note_on at the same tick, as in pretty_midi
+    eventos: List[Tuple[int, int, int, int]] = sorted(
+        chain.from_iterable(
+            (
+                (int(round(n.start / escala)), 1, n.pitch, n.velocity),
+                (int(round(n.end / escala)), 0, n.pitch, 0),
+            )
+            for n in notas
+        )
+    )
+
+    pista_tempo = mido.MidiTrack(
+        [
+            mido.MetaMessage("set_tempo", tempo=int(round(6e7 / bpm)), time=0),
+            mido.MetaMessage("end_of_track", time=1),
+        ]
+    )
+    pista = mido.MidiTrack()
+    if nombre_inst:
+        pista.append(mido.MetaMessage("track_name", name=nombre_inst, time=0))
+    pista.append(mido.Message("program_change", program=program, time=0))
+    # Delta times in one pass, then a single C-level extend instead of one
+    # append per message.
+    Message = mido.Message
+    pista.extend(
+        Message(
+            "note_on" if tipo else "note_off",
+            note=pitch,
+            velocity=vel,
+            time=tick - tick_prev,
+        )
+        for (tick_prev, _, _, _), (tick, tipo, pitch, vel) in zip(
+            chain(((0, 0, 0, 0),), eventos), eventos
+        )
+    )
+    pista.append(mido.MetaMessage("end_of_track", time=1))
+
+    mid = mido.MidiFile(ticks_per_beat=_RESOLUCION_SALIDA)
+    mid.tracks.extend([pista_tempo, pista])
+    with open(output_path, "wb", buffering=64 * 1024) as fh:
+        mid.save(file=fh)
 
 
 def exportar_montuno(
     midi_referencia_path: Path,
     voicings: List[List[int]],
-    asignaciones: List[Tuple[str, List[int], str]],
+    asignaciones: List[Tuple[str, Sequence[int], str]],
     num_compases: int,
     output_path: Path,
     armonizacion: str | None = None,
@@ -790,9 +1174,10 @@ def exportar_montuno(
     eighth-note of the progression.  ``armonizacion`` indica si las notas se
     deben duplicar (por ejemplo, en octavas).
     """
-    notes, pm = leer_midi_referencia(midi_referencia_path)
-    posiciones_base = obtener_posiciones_referencia(notes)
-    total_cor_ref, grid, bpm = _grid_and_bpm(pm)
+    _, posiciones_planas, total_cor_ref, grid, bpm, instrumento = _referencia_cacheada(
+        midi_referencia_path
+    )
+    posiciones_base = posiciones_planas
 
     if debug:
         print("Asignacion de acordes a corcheas:")
@@ -806,6 +1191,13 @@ def exportar_montuno(
 
     limite = total_dest_cor * grid
 
+    # Las posiciones que arrancan en o después del límite producirían notas
+    # que el recorte final descartaría de todos modos; se cortan aquí (están
+    # ordenadas por inicio) para no construirlas siquiera.
+    corte = int(np.searchsorted(posiciones["start"], limite, side="left"))
+    if corte < len(posiciones):
+        posiciones = posiciones[:corte]
+
     nuevas_notas = generar_notas_mixtas(
         posiciones, voicings, asignaciones, grid, debug=debug
     )
@@ -832,15 +1224,8 @@ def exportar_montuno(
         )
 
 
-    pm_out = pretty_midi.PrettyMIDI(initial_tempo=bpm)
-    inst_out = pretty_midi.Instrument(
-        program=pm.instruments[0].program,
-        is_drum=pm.instruments[0].is_drum,
-        name=pm.instruments[0].name,
-    )
-    inst_out.notes = nuevas_notas
-    pm_out.instruments.append(inst_out)
-    pm_out.write(str(output_path))
+    program, nombre_inst = instrumento
+    _escribir_montuno(output_path, nuevas_notas, bpm, program, nombre_inst)
 
 
 # ==========================================================================
@@ -878,7 +1263,7 @@ def _siguiente_grupo(indice: int) -> int:
 
 def procesar_progresion_en_grupos(
     texto: str, armonizacion_default: str | None = None
-) -> Tuple[List[Tuple[str, List[int], str]], int]:
+) -> Tuple[List[Tuple[str, Sequence[int], str]], int]:
     """Asignar corcheas a los acordes usando ``_siguiente_grupo``.
 
     El texto de la progresión se divide por barras ``|`` en segmentos.  Cada
@@ -890,10 +1275,16 @@ def procesar_progresion_en_grupos(
     Devuelve la lista de asignaciones y el número de compases escritos.
     """
 
-    segmentos = [s.strip() for s in texto.split("|") if s.strip()]
+    segmentos = [s for s in _SEPARADOR_SEGMENTOS.split(texto.strip()) if s]
     num_compases = len(segmentos)
 
-    resultado: List[Tuple[str, List[int], str]] = []
+    # Patrón extendido a la longitud máxima consumible (dos grupos por
+    # segmento), de modo que el bucle indexa directamente sin la rama ni el
+    # módulo de ``_siguiente_grupo`` por acorde.
+    repeticiones = (2 * num_compases) // max(len(PATRON_REPETIDO), 1) + 1
+    patron = list(PRIMER_BLOQUE) + list(PATRON_REPETIDO) * repeticiones
+
+    resultado: List[Tuple[str, Sequence[int], str]] = []
     indice_patron = 0
     posicion = 0  # corchea actual
 
@@ -903,19 +1294,11 @@ def procesar_progresion_en_grupos(
         """Return (chord, armonizacion) from ``token`` or ``None`` if token is
         just a harmonization marker."""
 
-        import re
-
-        m = re.match(r"^\((8|10|13|15)\)(.*)$", token)
+        m = _MARCA_ARMONIZACION.match(token)
         if m:
             codigo, resto = m.groups()
-            arm_map = {
-                "8": "Octavas",
-                "15": "Doble octava",
-                "10": "Décimas",
-                "13": "Treceavas",
-            }
             nonlocal arm_actual
-            arm_actual = arm_map[codigo]
+            arm_actual = _ARMONIZACION_POR_CODIGO[codigo]
             if resto:
                 return resto, arm_actual
             return None
@@ -929,22 +1312,20 @@ def procesar_progresion_en_grupos(
             if info is not None:
                 acordes.append(info)
         if len(acordes) == 1:
-            g1 = _siguiente_grupo(indice_patron)
-            g2 = _siguiente_grupo(indice_patron + 1)
-            dur = g1 + g2
-            indices = list(range(posicion, posicion + dur))
+            dur = patron[indice_patron] + patron[indice_patron + 1]
+            indices = range(posicion, posicion + dur)
             nombre, arm = acordes[0]
             resultado.append((nombre, indices, arm))
             posicion += dur
             indice_patron += 2
         elif len(acordes) == 2:
-            g1 = _siguiente_grupo(indice_patron)
-            indices1 = list(range(posicion, posicion + g1))
+            g1 = patron[indice_patron]
+            indices1 = range(posicion, posicion + g1)
             posicion += g1
             indice_patron += 1
 
-            g2 = _siguiente_grupo(indice_patron)
-            indices2 = list(range(posicion, posicion + g2))
+            g2 = patron[indice_patron]
+            indices2 = range(posicion, posicion + g2)
             posicion += g2
             indice_patron += 1
 
@@ -959,7 +1340,10 @@ def procesar_progresion_en_grupos(
                 "Cada segmento debe contener uno o dos acordes: " f"{seg}"
             )
 
-    for acorde, idxs, arm in resultado:
-        print(f"{acorde} ({arm}): {idxs}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "%s",
+            "\n".join(f"{acorde} ({arm}): {idxs}" for acorde, idxs, arm in resultado),
+        )
 
     return resultado, num_compases
@@ -1,5 +1,6 @@
 """Definition of the available montuno generation modes."""
 
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -14,6 +15,18 @@ from midi_utils import (
 # Traditional mode
 # ==========================================================================
 
+@lru_cache(maxsize=64)
+def _voicings_tradicionales(acordes: tuple[str, ...]) -> list[list[int]]:
+    """Memoized linked-voicing generation for repeated exports.
+
+    La progresión determina los voicings por completo, así que exportar la
+    misma progresión varias veces (cambiando clave, variación o armonización
+    desde la GUI) reutiliza el resultado.  Los consumidores nunca mutan las
+    listas devueltas.
+    """
+    return generar_voicings_enlazados_tradicional(list(acordes))
+
+
 def montuno_tradicional(
     progresion_texto: str,
     midi_ref: Path,
@@ -29,7 +42,7 @@ def montuno_tradicional(
         progresion_texto, armonizacion
     )
     acordes = [a for a, _, _ in asignaciones]
-    voicings = generar_voicings_enlazados_tradicional(acordes)
+    voicings = _voicings_tradicionales(tuple(acordes))
     exportar_montuno(
         midi_ref,
         voicings,
@@ -1,7 +1,13 @@
 """Utilities for generating piano voicings."""
 
+import logging
+import re
+
+from functools import lru_cache
 from typing import List, Tuple
 
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # Pitch range limits for the generated voicings.  Notes are adjusted so that
 # they remain within this interval when building the linked voicings.
@@ -58,14 +64,17 @@ NOTAS = {
 # Chord parsing and linked voicing generation
 # ==========================================================================
 
+# Compilado una sola vez; los nombres de acorde se parsean repetidamente a lo
+# largo de una sesión.
+_ACORDE_RE = re.compile(
+    r'^([A-G][b#]?)(m6|m7|m∆|m|6|7|∆sus4|∆sus2|∆|\+7|º7|º∆|ø|7sus4|7sus2|7\(b5\)|7\(b9\)|\+7\(b9\)|7\(b5\)b9|7sus4\(b9\)|∆\(b5\))$'
+)
+
+
+@lru_cache(maxsize=512)
 def parsear_nombre_acorde(nombre: str) -> Tuple[int, str]:
     """Parse a chord name into root MIDI pitch class and suffix."""
-    import re
-
-    m = re.match(
-        r'^([A-G][b#]?)(m6|m7|m∆|m|6|7|∆sus4|∆sus2|∆|\+7|º7|º∆|ø|7sus4|7sus2|7\(b5\)|7\(b9\)|\+7\(b9\)|7\(b5\)b9|7sus4\(b9\)|∆\(b5\))$',
-        nombre,
-    )
+    m = _ACORDE_RE.match(nombre)
     if not m:
         raise ValueError(f"Acorde no reconocido: {nombre}")
     root, suf = m.group(1), m.group(2)
@@ -73,12 +82,16 @@ def parsear_nombre_acorde(nombre: str) -> Tuple[int, str]:
 
 
 def _ajustar_octava(pitch: int) -> int:
-    """Confine ``pitch`` within ``RANGO_MIN`` .. ``RANGO_MAX`` by octaves."""
+    """Confine ``pitch`` within ``RANGO_MIN`` .. ``RANGO_MAX`` by octaves.
+
+    Calcula de una vez cuántas octavas hay que desplazar en lugar de iterar;
+    los valores ya dentro del rango (incluidos 65..67) no se tocan.
+    """
 
-    while pitch < RANGO_MIN:
-        pitch += 12
-    while pitch > RANGO_MAX:
-        pitch -= 12
+    if pitch < RANGO_MIN:
+        pitch += 12 * ((RANGO_MIN - pitch + 11) // 12)
+    elif pitch > RANGO_MAX:
+        pitch -= 12 * ((pitch - RANGO_MAX + 11) // 12)
     return pitch
 
 
@@ -92,10 +105,15 @@ def generar_voicings_enlazados_tradicional(progresion: List[str]) -> List[List[i
     above in ascending order.
     """
 
-    import pretty_midi
+    # El formateo de nombres de nota (vía pretty_midi) solo se paga si el
+    # volcado de depuración está activo.
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        import pretty_midi
 
     referencia = [55, 57, 60, 64]  # default positions for the four voices
     voicings: List[List[int]] = []
+    lineas: List[str] = []
     bajo_anterior = referencia[0]
 
     def ajustar(pc: int, target: int) -> int:
@@ -139,13 +157,17 @@ def generar_voicings_enlazados_tradicional(progresion: List[str]) -> List[List[i
 
         voicing = sorted([bajo] + notas_restantes)
         voicings.append(voicing)
-        nombres = [pretty_midi.note_number_to_name(n) for n in voicing]
-        print(
-            f"{nombre}: {nombres} - bajo {pretty_midi.note_number_to_name(bajo)}"
-            f" ({bajo_intervalo})"
-        )
+        if debug:
+            nombres = [pretty_midi.note_number_to_name(n) for n in voicing]
+            lineas.append(
+                f"{nombre}: {nombres} - bajo"
+                f" {pretty_midi.note_number_to_name(bajo)} ({bajo_intervalo})"
+            )
         bajo_anterior = bajo
 
+    if debug:
+        logger.debug("%s", "\n".join(lineas))
+
     return voicings
 
 # Future voicing strategies for other modes can be added here